@@ -1,26 +1,21 @@
 # src/ai_analyzer.py
 import anthropic
+import functools
+import hashlib
+import io
 import os
+import re
+import warnings
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
-class SecurityAnalyzer:
-    def __init__(self):
-        self.client = anthropic.Anthropic(
-            api_key=os.getenv('ANTHROPIC_API_KEY')
-        )
-
-    def analyze_scan_results(self, scanner_results):
-        """Send scanner results to Claude for analysis"""
-
-        # Combine all scanner outputs
-        combined_results = "\n\n".join([
-            f"# {tool_name.upper()} Results\n{content}"
-            for tool_name, content in scanner_results.items()
-        ])
-
-        prompt = f"""You are an expert penetration tester analyzing security scan results.
+MODEL = "claude-sonnet-4-20250514"
+MAX_TOKENS = 8000
+# Bump whenever PROMPT_TEMPLATE changes so cached reports are invalidated
+PROMPT_VERSION = 1
+PROMPT_TEMPLATE = """You are an expert penetration tester analyzing security scan results.
 
 SCAN RESULTS:
 {combined_results}
@@ -59,10 +54,203 @@ Please analyze these results and create a comprehensive security assessment repo
 
 Format the report professionally with clear sections and markdown formatting."""
 
+# Concurrent API requests in a --batch run (main._batch_pipeline), to stay under rate limits
+MAX_CONCURRENT_ANALYSES = 4
+
+# Cached reports live next to the generated reports in the project root
+CACHE_DIR = Path(__file__).parent.parent / 'reports' / '.cache'
+
+# Per-tool cap on scanner output sent to Claude, of which TAIL_CHARS come from the end
+MAX_TOOL_CHARS = 50_000
+TAIL_CHARS = 10_000
+TRUNCATION_MARKER = "[... truncated {} characters from {} lines ...]"
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*m')
+# Tools whose oversized output is reduced to lines that look like findings
+NOISY_TOOLS = ('nikto', 'dirb', 'sqlmap')
+FINDING_LINE = re.compile(
+    r'OSVDB|CVE|vulnerab|injectable|payload|parameter|DBMS|DIRECTORY|200 OK|\b(?:200|30[12]|500)\b|^\s*[+#]',
+    re.IGNORECASE
+)
+
+def _compress_scanner_output(tool_name, text):
+    """Shrink raw scanner output before it is added to the prompt"""
+    # Strip colour codes and collapse runs of identical lines
+    lines = []
+    previous, count = None, 0
+    for line in ANSI_ESCAPE.sub('', text).splitlines():
+        if line == previous:
+            count += 1
+            continue
+        if count > 1:
+            lines[-1] += f" [repeated {count}x]"
+        lines.append(line)
+        previous, count = line, 1
+    if count > 1:
+        lines[-1] += f" [repeated {count}x]"
+
+    # Oversized output from noisy tools is mostly per-path misses; keep the findings
+    if sum(map(len, lines)) > MAX_TOOL_CHARS and any(tool in tool_name.lower() for tool in NOISY_TOOLS):
+        lines = [line for line in lines if FINDING_LINE.search(line)]
+
+    if sum(map(len, lines)) + len(lines) > MAX_TOOL_CHARS:
+        # Keep the start and the end; tools print their summaries last
+        # Leave room for the marker; its counts can't exceed the totals
+        marker_len = len(TRUNCATION_MARKER.format(sum(map(len, lines)), len(lines))) + 1
+        head_budget, tail_budget = MAX_TOOL_CHARS - TAIL_CHARS - marker_len, TAIL_CHARS
+        head = 0
+        while len(lines[head]) + 1 <= head_budget:
+            head_budget -= len(lines[head]) + 1
+            head += 1
+        tail = len(lines)
+        while tail > head and len(lines[tail - 1]) + 1 <= tail_budget:
+            tail_budget -= len(lines[tail - 1]) + 1
+            tail -= 1
+        elided = lines[head:tail]
+        # A line too long for what is left of a budget is sliced rather than dropped whole
+        prefix = elided[0][:max(head_budget - 1, 0)]
+        suffix_len = min(max(tail_budget - 1, 0), len(elided[-1]) - (len(prefix) if len(elided) == 1 else 0))
+        suffix = elided[-1][len(elided[-1]) - suffix_len:]
+        dropped = sum(map(len, elided)) - len(prefix) - len(suffix)
+        marker = TRUNCATION_MARKER.format(dropped, len(elided))
+        lines = lines[:head] + ([prefix] if prefix else []) + [marker] + ([suffix] if suffix else []) + lines[tail:]
+
+    return "\n".join(lines)
+
+@functools.lru_cache(maxsize=None)
+def _get_client():
+    """Process-wide Anthropic client, so repeated analyses reuse pooled HTTP/2 connections"""
+    return anthropic.Anthropic(
+        api_key=os.getenv('ANTHROPIC_API_KEY'),
+        max_retries=3,
+        timeout=anthropic.Timeout(600.0, connect=10.0),
+        # The SDK's own client class keeps its default keep-alive pool limits
+        http_client=anthropic.DefaultHttpxClient(http2=True)
+    )
+
+def new_async_client():
+    """New async Anthropic client configured like _get_client()
+
+    Async connection pools belong to the event loop that created them, so
+    each asyncio.run() gets its own client instead of a shared singleton.
+    """
+    return anthropic.AsyncAnthropic(
+        api_key=os.getenv('ANTHROPIC_API_KEY'),
+        max_retries=3,
+        timeout=anthropic.Timeout(600.0, connect=10.0),
+        http_client=anthropic.DefaultAsyncHttpxClient(http2=True)
+    )
+
+class SecurityAnalyzer:
+    def __init__(self):
+        self.client = _get_client()
+
+    def _combine_results(self, scanner_results):
+        """Combine all scanner outputs into one block of text"""
+        # Written piece by piece to avoid a list of per-tool strings alongside the result
+        buf = io.StringIO()
+        write = buf.write
+        for i, (tool_name, content) in enumerate(scanner_results.items()):
+            if i:
+                write('\n\n')
+            write('# ')
+            write(tool_name.upper())
+            write(' Results\n')
+            write(_compress_scanner_output(tool_name, content))
+        return buf.getvalue()
+
+    def _build_prompt(self, combined_results):
+        """Build the analysis prompt from combined scanner results"""
+        return PROMPT_TEMPLATE.format_map({"combined_results": combined_results})
+
+    def _cache_path(self, combined_results):
+        """Cache file for a given set of scanner results, model and prompt version"""
+        h = hashlib.blake2b(f"{MODEL}:{PROMPT_VERSION}:".encode(), digest_size=16)
+        h.update(combined_results.encode())
+        return CACHE_DIR / f"{h.hexdigest()}.md"
+
+    def _load_cached(self, cache_path):
+        """Return a cached report, or None on a cache miss or an unreadable cache entry"""
+        try:
+            return cache_path.read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return None
+        except (OSError, UnicodeDecodeError) as e:
+            warnings.warn(f"Ignoring unreadable cache entry {cache_path}: {e}", RuntimeWarning, stacklevel=3)
+            return None
+
+    def _store_cached(self, cache_path, report):
+        """Atomically write a report to the cache; the cache is best-effort, so failures only warn"""
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb', buffering=1 << 20) as f:
+                f.write(report.encode('utf-8'))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            warnings.warn(f"Could not cache report at {cache_path}: {e}", RuntimeWarning, stacklevel=2)
+            try:
+                tmp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    def _lookup(self, scanner_results, force_refresh):
+        """Combine scanner results and check the cache
+
+        Returns (combined_results, cache_path, cached report or None).
+        """
+        combined_results = self._combine_results(scanner_results)
+        cache_path = self._cache_path(combined_results)
+        cached = None if force_refresh else self._load_cached(cache_path)
+        return combined_results, cache_path, cached
+
+    def analyze_scan_results(self, scanner_results, force_refresh=False):
+        """Send scanner results to Claude for analysis"""
+        combined_results, cache_path, cached = self._lookup(scanner_results, force_refresh)
+        if cached is not None:
+            return cached
+
         message = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=8000,
-            messages=[{"role": "user", "content": prompt}]
+            model=MODEL,
+            max_tokens=MAX_TOKENS,
+            messages=[{"role": "user", "content": self._build_prompt(combined_results)}]
+        )
+
+        report = message.content[0].text
+        self._store_cached(cache_path, report)
+        return report
+
+    def analyze_scan_results_stream(self, scanner_results, force_refresh=False):
+        """Send scanner results to Claude and yield the report text as it arrives"""
+        combined_results, cache_path, cached = self._lookup(scanner_results, force_refresh)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        with self.client.messages.stream(
+            model=MODEL,
+            max_tokens=MAX_TOKENS,
+            messages=[{"role": "user", "content": self._build_prompt(combined_results)}]
+        ) as stream:
+            for text in stream.text_stream:
+                parts.append(text)
+                yield text
+
+        # Only reached when the stream completed, so partial reports are never cached
+        self._store_cached(cache_path, "".join(parts))
+
+    async def analyze_scan_results_async(self, client, scanner_results, force_refresh=False):
+        """Analyze one set of scanner results with an async client from new_async_client()"""
+        combined_results, cache_path, cached = self._lookup(scanner_results, force_refresh)
+        if cached is not None:
+            return cached
+
+        message = await client.messages.create(
+            model=MODEL,
+            max_tokens=MAX_TOKENS,
+            messages=[{"role": "user", "content": self._build_prompt(combined_results)}]
         )
 
-        return message.content[0].text
+        report = message.content[0].text
+        self._store_cached(cache_path, report)
+        return report
@@ -1,21 +1,137 @@
 #!/usr/bin/env python3
 # src/main.py
+import argparse
+import asyncio
+import os
 import sys
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePath
 from report_generator import load_scanner_results
-from ai_analyzer import SecurityAnalyzer
+from ai_analyzer import MAX_CONCURRENT_ANALYSES, SecurityAnalyzer, new_async_client
 from terminal_display import TerminalDisplay
-from pdf_generator import PDFReportGenerator
+from pdf_generator import WEASYPRINT_AVAILABLE, PDFReportGenerator
+
+def _tee(chunks, f):
+    """Write each streamed chunk to binary file f before passing it on"""
+    for chunk in chunks:
+        f.write(chunk.encode('utf-8'))
+        yield chunk
+
+def _write_report(report_file, report):
+    """Write a markdown report as UTF-8 bytes"""
+    with open(report_file, 'wb', buffering=1 << 20) as f:
+        f.write(report.encode('utf-8'))
+
+def _is_safe_target(target):
+    """Whether a target name is a relative path with no '..' components"""
+    path = PurePath(target)
+    return not path.is_absolute() and not path.drive and '..' not in path.parts
+
+def _save_target_reports(display, pdf_gen, reports_dir, target, report):
+    """Write a target's markdown and PDF reports under reports/<target>/"""
+    target_dir = reports_dir / target
+    target_dir.mkdir(parents=True, exist_ok=True)
+    _write_report(target_dir / 'security_report.md', report)
+    try:
+        pdf_gen.generate_pdf(report, target_dir / 'security_report.pdf')
+    except Exception as e:
+        display.console.print(f"[yellow]Warning: PDF generation failed for {target}: {e}[/yellow]")
+    display.display_success(f"Reports for {target} saved to {target_dir}")
+
+async def _batch_pipeline(targets, display, analyzer, pdf_gen, reports_dir, force_refresh):
+    """Load, analyze and save targets as a pipeline, each stage starting as soon as its input is ready"""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=MAX_CONCURRENT_ANALYSES)
+    # PDF rendering is CPU-bound and not thread-safe, so saving runs on one thread
+    save_executor = ThreadPoolExecutor(max_workers=1)
+
+    async def load_targets():
+        for target in targets:
+            try:
+                scanner_results = await loop.run_in_executor(
+                    None, load_scanner_results, str(Path('scanner_results') / target)
+                )
+            except OSError as e:
+                display.console.print(f"[red]Error loading scanner results for {target}: {e}[/red]")
+                continue
+            if scanner_results:
+                await queue.put((target, scanner_results))
+            else:
+                display.console.print(f"[yellow]Warning: no scanner results for {target}, skipping[/yellow]")
+        for _ in range(MAX_CONCURRENT_ANALYSES):
+            await queue.put(None)
+
+    async def analyze_targets(client):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            target, scanner_results = item
+            try:
+                report = await analyzer.analyze_scan_results_async(client, scanner_results, force_refresh)
+            except Exception as e:
+                display.console.print(f"[red]Error during AI analysis of {target}: {e}[/red]")
+                continue
+            # A failed save must not end this worker, or the producer would block on the full queue
+            try:
+                await loop.run_in_executor(
+                    save_executor, _save_target_reports, display, pdf_gen, reports_dir, target, report
+                )
+            except Exception as e:
+                display.console.print(f"[red]Error saving reports for {target}: {e}[/red]")
+
+    with save_executor:
+        async with new_async_client() as client:
+            # A fixed pool of analysis workers keeps concurrent API requests under rate limits
+            workers = [asyncio.create_task(analyze_targets(client)) for _ in range(MAX_CONCURRENT_ANALYSES)]
+            await load_targets()
+            await asyncio.gather(*workers)
+
+def run_batch(targets_file, display, analyzer, pdf_gen, reports_dir, force_refresh=False):
+    """Analyze every target listed in targets_file, saving each report as soon as it is ready"""
+    with open(targets_file, encoding='utf-8') as f:
+        targets = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    # Targets become paths under scanner_results/ and reports/, so they must stay inside them
+    valid_targets = []
+    for target in targets:
+        if _is_safe_target(target):
+            valid_targets.append(target)
+        else:
+            display.console.print(f"[yellow]Warning: invalid target name {target!r}, skipping[/yellow]")
+    targets = valid_targets
+
+    display.display_loading(f"Analyzing {len(targets)} targets with Claude AI")
+    asyncio.run(_batch_pipeline(targets, display, analyzer, pdf_gen, reports_dir, force_refresh))
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate a security report from scanner results")
+    parser.add_argument('--refresh', action='store_true',
+                        help="ignore cached AI analyses and query Claude again")
+    parser.add_argument('--batch', metavar='TARGETS_FILE',
+                        help="analyze each target listed in TARGETS_FILE (one per line) "
+                             "from scanner_results/<target>/")
+    args = parser.parse_args()
+
     # Initialize components
-    display = TerminalDisplay()
+    # With WeasyPrint available the PDF is rendered from the terminal output itself
+    display = TerminalDisplay(record=WEASYPRINT_AVAILABLE)
     analyzer = SecurityAnalyzer()
     pdf_gen = PDFReportGenerator()
 
     # Display header
     display.display_header()
 
+    # Get the absolute path relative to the script location
+    script_dir = Path(__file__).parent.parent  # Go up to project root
+    reports_dir = script_dir / 'reports'
+    reports_dir.mkdir(exist_ok=True)
+
+    if args.batch:
+        run_batch(args.batch, display, analyzer, pdf_gen, reports_dir, force_refresh=args.refresh)
+        display.console.print("\n[bold green]✓ Batch report generation complete![/bold green]\n")
+        return
+
     # Step 1: Load scanner results
     display.display_loading("Loading scanner results from teammate")
     try:
@@ -25,36 +141,48 @@ def main():
         display.console.print(f"[red]Error loading scanner results: {e}[/red]")
         sys.exit(1)
 
-    # Step 2: Analyze with Claude AI
+    report_file = reports_dir / 'security_report.md'
+    # Stream into a temporary file so a failed analysis leaves the previous report intact
+    partial_file = report_file.with_name(report_file.name + '.partial')
+
+    # Step 2: Analyze with Claude AI, saving the markdown report as it streams in
     display.display_loading("Analyzing vulnerabilities with Claude AI")
     try:
-        ai_report = analyzer.analyze_scan_results(scanner_results)
+        try:
+            with open(partial_file, 'wb', buffering=1 << 20) as f:
+                chunks = analyzer.analyze_scan_results_stream(
+                    scanner_results, force_refresh=args.refresh
+                )
+                ai_report = display.display_stream(_tee(chunks, f))
+            os.replace(partial_file, report_file)
+        except BaseException:
+            partial_file.unlink(missing_ok=True)
+            raise
         display.display_success("AI analysis complete")
+        display.display_success(f"Markdown report saved to {report_file}")
     except Exception as e:
         display.console.print(f"[red]Error during AI analysis: {e}[/red]")
         sys.exit(1)
 
-    # Step 3: Display report in terminal
-    display.display_report(ai_report)
+    # Step 3: Display report in terminal while the PDF is generated in the background
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        if display.console.record:
+            # The PDF is rendered from the recorded terminal output, so it waits for the display.
+            # Export here, before any further progress output reaches the recording.
+            display.display_report(ai_report)
+            report_html = pdf_gen.export_console_html(display.console)
+            pdf_future = executor.submit(pdf_gen.generate_pdf_from_html, report_html)
+        else:
+            pdf_future = executor.submit(pdf_gen.generate_pdf, ai_report)
+            display.display_report(ai_report)
 
-    # Step 4: Save markdown report
-    display.display_loading("Saving markdown report")
-    # Get the absolute path relative to the script location
-    script_dir = Path(__file__).parent.parent  # Go up to project root
-    reports_dir = script_dir / 'reports'
-    reports_dir.mkdir(exist_ok=True)
-    report_file = reports_dir / 'security_report.md'
-    with open(report_file, 'w') as f:
-        f.write(ai_report)
-    display.display_success(f"Markdown report saved to {report_file}")
-
-    # Step 5: Generate PDF
-    display.display_loading("Generating PDF report")
-    try:
-        pdf_path = pdf_gen.generate_pdf(ai_report)
-        display.display_success(f"PDF report saved to {pdf_path}")
-    except Exception as e:
-        display.console.print(f"[yellow]Warning: PDF generation failed: {e}[/yellow]")
+        # Step 4: Wait for the PDF
+        display.display_loading("Generating PDF report")
+        try:
+            pdf_path = pdf_future.result()
+            display.display_success(f"PDF report saved to {pdf_path}")
+        except Exception as e:
+            display.console.print(f"[yellow]Warning: PDF generation failed: {e}[/yellow]")
 
     # Final message
     display.console.print("\n[bold green]✓ Report generation complete![/bold green]\n")
@@ -2,50 +2,331 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, XPreformatted
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from datetime import datetime
+from html import escape
+from html.entities import name2codepoint
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
 import markdown
 from io import StringIO
 
+# WeasyPrint is optional: it needs Pango installed on the system, so fall back
+# to reportlab when either the package or its native libraries are missing
+try:
+    from weasyprint import HTML, CSS
+except (ImportError, OSError):
+    HTML = CSS = None
+WEASYPRINT_AVAILABLE = HTML is not None
+
+# Stylesheet for the WeasyPrint backend, mirroring the reportlab styles below
+CSS_TEMPLATE = """
+@page { size: letter; margin: 1in 1in 0.25in 1in; }
+body { font-family: Helvetica, Arial, sans-serif; font-size: 10pt; line-height: 1.2; }
+h1 { font-size: 24pt; color: #1a237e; text-align: center; margin-bottom: 30pt; }
+h2 { font-size: 16pt; color: #283593; margin: 12pt 0; }
+h3, h4, h5, h6 { font-size: 12pt; }
+p, ul, ol, table, pre { margin: 0 0 6pt 0; }
+pre, code { font-family: Courier, monospace; font-size: 8pt; }
+pre { white-space: pre-wrap; }
+table { border-collapse: collapse; }
+th, td { border: 1px solid #9e9e9e; padding: 2pt 4pt; text-align: left; }
+.title-page { page-break-after: always; padding-top: 2in; }
+"""
+_css = None
+
+# Page layout for PDFs rendered from a recorded rich console. Passed to
+# Console.export_html, so literal braces are doubled; {date} is filled in first.
+CONSOLE_HTML_FORMAT = """<!DOCTYPE html>
+<html><head><meta charset="UTF-8">
+<style>
+@page {{ size: letter; margin: 0.75in; }}
+{stylesheet}
+body {{ color: {foreground}; background-color: {background}; }}
+pre {{ font-family: 'DejaVu Sans Mono', Menlo, Courier, monospace; font-size: 7.5pt; white-space: pre-wrap; }}
+.title-page {{ page-break-after: always; padding-top: 2in; text-align: center; font-family: Helvetica, Arial, sans-serif; }}
+.title-page h1 {{ font-size: 24pt; color: #1a237e; }}
+</style>
+</head>
+<body>
+<section class="title-page"><h1>PENETRATION TESTING REPORT</h1><p>Generated: {date}</p></section>
+<pre><code>{code}</code></pre>
+</body></html>
+"""
+
+# reportlab paragraph markup for the inline HTML tags markdown emits
+INLINE_TAGS = {
+    'strong': ('<b>', '</b>'),
+    'b': ('<b>', '</b>'),
+    'em': ('<i>', '</i>'),
+    'i': ('<i>', '</i>'),
+    'code': ('<font face="Courier">', '</font>'),
+}
+
+# Only these links become PDF hyperlinks; anything else is rendered as its text
+LINK_SCHEMES = ('http://', 'https://', 'mailto:')
+
+# List item lines; Python-Markdown needs a blank line between text and a list below it
+LIST_ITEM = re.compile(r'[ \t]*(?:[-*+]|\d+\.)[ \t]')
+CODE_FENCE = re.compile(r'[ \t]*(?:```|~~~)')
+INDENTED_CODE = re.compile(r'(?: {4}|\t)')
+
+def _separate_lists(report_content):
+    """Insert a blank line between a line of text and a list directly under it
+
+    Fenced and indented code blocks are copied unchanged.
+    """
+    out = []
+    previous = ''
+    in_fence = in_indented = False
+    for line in report_content.split('\n'):
+        if CODE_FENCE.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            # Indented code starts after a blank line and runs until an unindented line
+            if not line.strip():
+                pass
+            elif INDENTED_CODE.match(line) and (in_indented or not previous.strip()):
+                in_indented = True
+            else:
+                in_indented = False
+                if (LIST_ITEM.match(line) and previous.strip()
+                        and not LIST_ITEM.match(previous) and not CODE_FENCE.match(previous)):
+                    out.append('')
+        out.append(line)
+        previous = line
+    return '\n'.join(out)
+
+# Named HTML entities such as &nbsp; that plain XML does not define
+HTML_ENTITY = re.compile(r'&([A-Za-z][A-Za-z0-9]*);')
+XML_ENTITIES = {'amp', 'lt', 'gt', 'quot', 'apos'}
+
+def _xml_entity(match):
+    name = match.group(1)
+    if name in XML_ENTITIES or name not in name2codepoint:
+        return match.group(0)
+    return f"&#{name2codepoint[name]};"
+
+# Reports shorter than this render in-process; a process pool costs more than it saves
+PARALLEL_MIN_CHARS = 100_000
+
+# Top-level (# and ##) headings, where a report can be split into independent chunks
+SECTION_HEADING = re.compile(r'#{1,2} ')
+
+def _split_sections(report_content, n_chunks):
+    """Split a report at top-level headings into at most n_chunks similarly sized chunks"""
+    target = len(report_content) / n_chunks
+    chunks = []
+    start = offset = 0
+    in_fence = False
+    for line in report_content.splitlines(keepends=True):
+        if CODE_FENCE.match(line):
+            in_fence = not in_fence
+        elif not in_fence and offset - start >= target and SECTION_HEADING.match(line):
+            chunks.append(report_content[start:offset])
+            start = offset
+        offset += len(line)
+    chunks.append(report_content[start:])
+    return chunks
+
+def _markdown_to_html(report_content, extensions):
+    """Convert a markdown report to HTML"""
+    return markdown.markdown(_separate_lists(report_content), extensions=extensions)
+
+def _parse_blocks(html):
+    """Parse markdown's HTML output and return its top-level block elements"""
+    root = ET.fromstring(f"<div>{HTML_ENTITY.sub(_xml_entity, html)}</div>")
+
+    blocks = []
+    for el in root:
+        # Unwrap containers so their paragraphs are laid out individually
+        if el.tag in ('blockquote', 'div'):
+            blocks.extend(el)
+        else:
+            blocks.append(el)
+    return blocks
+
+def _inline(el):
+    """Convert an element's inline content to reportlab paragraph markup"""
+    parts = [escape(el.text or '', quote=False)]
+    for child in el:
+        if child.tag == 'br':
+            parts.append('<br/>')
+        elif child.tag == 'a' and child.get('href', '').startswith(LINK_SCHEMES):
+            # In-document anchors (#section, footnotes) have no reportlab destination; they fall through to text
+            parts.append(f'<a href="{escape(child.get("href"))}">{_inline(child)}</a>')
+        elif child.tag not in ('ul', 'ol'):
+            start, end = INLINE_TAGS.get(child.tag, ('', ''))
+            parts.append(start + _inline(child) + end)
+        parts.append(escape(child.tail or '', quote=False))
+    return ''.join(parts).strip()
+
+def _list_items(list_el, depth=0):
+    """Paragraph markup for each item of a (possibly nested) list, nested items included in their parent's"""
+    items = []
+    # Literal characters rather than &nbsp;/&bull;: entities split a paragraph
+    # into several fragments, roughly doubling its layout time
+    indent = '\u00a0' * 4 * depth
+    for n, item in enumerate(list_el.findall('li'), 1):
+        marker = f"{n}." if list_el.tag == 'ol' else '\u2022'
+        lines = [f"{indent}{marker} {_inline(item)}"]
+        for nested in item:
+            if nested.tag in ('ul', 'ol'):
+                lines.extend(_list_items(nested, depth + 1))
+        items.append('<br/>'.join(lines))
+    return items
+
+def _table_lines(table_el):
+    """Flatten a table into one line of paragraph markup per row"""
+    return [
+        ' | '.join(_inline(cell) for cell in row)
+        for row in table_el.iter('tr')
+    ]
+
+# Body blocks laid out as one paragraph per list item or table row, so no
+# single Paragraph spans pages; anything else is one paragraph of inline text
+BLOCK_PARAGRAPHS = {
+    'ul': _list_items,
+    'ol': _list_items,
+    'table': _table_lines,
+}
+
+@functools.lru_cache(maxsize=256)
+def _ensure_output_dir(dest):
+    """Create an output directory, at most once per path per process
+
+    Assumes the directory is not deleted while the program is running.
+    """
+    path = Path(dest)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+# Project root, which relative output paths are resolved against
+PROJECT_ROOT = Path(__file__).parent.parent
+
+def _resolve_output_path(output_path):
+    """Resolve output_path against the project root and ensure its directory exists"""
+    # Callers such as batch mode already pass Path objects; only parse strings
+    if not isinstance(output_path, Path):
+        output_path = Path(output_path)
+
+    # If output_path is relative, make it relative to project root
+    if not output_path.is_absolute():
+        output_path = PROJECT_ROOT / output_path
+
+    _ensure_output_dir(str(output_path.parent))
+    return output_path
+
+# The stylesheet is built once per process and shared by every generator
+_styles = None
+_styles_lock = threading.Lock()
+
+def _create_custom_styles(styles):
+    """Create custom styles for the report"""
+    styles.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor='#1a237e',
+        spaceAfter=30,
+        alignment=TA_CENTER
+    ))
+
+    styles.add(ParagraphStyle(
+        name='SectionHeading',
+        parent=styles['Heading2'],
+        fontSize=16,
+        textColor='#283593',
+        spaceAfter=12,
+        spaceBefore=12
+    ))
+
+    styles.add(ParagraphStyle(
+        name='ReportBody',
+        parent=styles['Normal'],
+        spaceAfter=6
+    ))
+
+    styles.add(ParagraphStyle(
+        name='ReportCode',
+        parent=styles['Code'],
+        spaceAfter=6
+    ))
+
+def _get_styles():
+    """Return the shared stylesheet, building it on first use"""
+    global _styles
+    with _styles_lock:
+        if _styles is None:
+            styles = getSampleStyleSheet()
+            _create_custom_styles(styles)
+            _styles = styles
+    return _styles
+
+def _warmup_styles():
+    """Process pool initializer: build the stylesheet before the first chunk is dispatched"""
+    _get_styles()
+
 class PDFReportGenerator:
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._create_custom_styles()
-
-    def _create_custom_styles(self):
-        """Create custom styles for the report"""
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            textColor='#1a237e',
-            spaceAfter=30,
-            alignment=TA_CENTER
-        ))
-
-        self.styles.add(ParagraphStyle(
-            name='SectionHeading',
-            parent=self.styles['Heading2'],
-            fontSize=16,
-            textColor='#283593',
-            spaceAfter=12,
-            spaceBefore=12
-        ))
-
-    def generate_pdf(self, report_content, output_path='reports/security_report.pdf'):
-        """Generate PDF from markdown report"""
-        # Get the absolute path relative to the script location
-        script_dir = Path(__file__).parent.parent  # Go up to project root
-
-        # If output_path is relative, make it relative to project root
-        if not Path(output_path).is_absolute():
-            output_path = script_dir / output_path
-
-        # Ensure the directory exists
-        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        self.styles = _get_styles()
+
+    def export_console_html(self, console):
+        """Export what a recording rich Console has displayed as a printable HTML page
+
+        Call this on the thread that prints to the console, before printing
+        anything else, so later progress output is not part of the export.
+        """
+        code_format = CONSOLE_HTML_FORMAT.replace('{date}', datetime.now().strftime('%B %d, %Y'))
+        return console.export_html(inline_styles=True, code_format=code_format)
+
+    def generate_pdf_from_html(self, html, output_path='reports/security_report.pdf'):
+        """Generate PDF from an HTML page such as export_console_html() returns
+
+        Reuses the terminal rendering instead of parsing the markdown again;
+        requires WeasyPrint.
+        """
+        if not WEASYPRINT_AVAILABLE:
+            raise RuntimeError("WeasyPrint is required to render console output to PDF")
+
+        output_path = _resolve_output_path(output_path)
+        HTML(string=html).write_pdf(str(output_path))
+        return output_path
 
+    def generate_pdf(self, report_content, output_path='reports/security_report.pdf', n_workers=None):
+        """Generate PDF from markdown report
+
+        Long reports are split at top-level headings and rendered on up to
+        n_workers processes (default: one per CPU) when using reportlab.
+        """
+        output_path = _resolve_output_path(output_path)
+
+        if WEASYPRINT_AVAILABLE:
+            return self._generate_html_pdf(report_content, output_path)
+
+        if n_workers is None:
+            n_workers = os.cpu_count() or 1
+
+        chunks = [report_content]
+        if n_workers > 1 and len(report_content) >= PARALLEL_MIN_CHARS:
+            chunks = _split_sections(report_content, n_workers)
+
+        if len(chunks) > 1:
+            self._generate_parallel(chunks, output_path, n_workers)
+        else:
+            self._build(output_path, self._title_story() + [PageBreak()] + self._body_story(report_content))
+        return output_path
+
+    def _build(self, output_path, story):
+        """Lay out a story into a PDF file"""
         doc = SimpleDocTemplate(
             str(output_path),
             pagesize=letter,
@@ -54,10 +335,11 @@ class PDFReportGenerator:
             topMargin=72,
             bottomMargin=18
         )
+        doc.build(story)
 
+    def _title_story(self):
+        """Flowables for the title page"""
         story = []
-
-        # Title page
         story.append(Spacer(1, 2*inch))
         title = Paragraph(
             "PENETRATION TESTING REPORT",
@@ -71,20 +353,99 @@ class PDFReportGenerator:
             self.styles['Normal']
         )
         story.append(subtitle)
-        story.append(PageBreak())
-
-        # Convert markdown to paragraphs
-        lines = report_content.split('\n')
-        for line in lines:
-            if line.startswith('# '):
-                story.append(Paragraph(line[2:], self.styles['CustomTitle']))
-                story.append(Spacer(1, 12))
-            elif line.startswith('## '):
-                story.append(Paragraph(line[3:], self.styles['SectionHeading']))
-                story.append(Spacer(1, 12))
-            elif line.strip():
-                story.append(Paragraph(line, self.styles['Normal']))
-                story.append(Spacer(1, 6))
+        return story
 
-        doc.build(story)
+    def _body_story(self, report_content):
+        """Flowables for the report body"""
+        story = []
+        append = story.append
+
+        # Resolve styles once rather than per block
+        body_style = self.styles['ReportBody']
+        code_style = self.styles['ReportCode']
+        heading_styles = dict.fromkeys(('h3', 'h4', 'h5', 'h6'), self.styles['Heading3'])
+        heading_styles['h1'] = self.styles['CustomTitle']
+        heading_styles['h2'] = self.styles['SectionHeading']
+
+        # Convert markdown to HTML once and lay it out block by block
+        html = _markdown_to_html(report_content, ['extra'])
+        try:
+            blocks = _parse_blocks(html)
+        except ET.ParseError:
+            # Raw HTML in the report can make the output unparseable; fall back to plain text
+            blocks = []
+            for line in report_content.split('\n'):
+                if line.strip():
+                    append(Paragraph(escape(line, quote=False), body_style))
+
+        # One Paragraph per block: merging blocks with <br/> moves ReportLab onto
+        # its slower line-breaking path, and a merged Paragraph that spans pages
+        # is re-wrapped at every page break
+        for block in blocks:
+            tag = block.tag
+            heading_style = heading_styles.get(tag)
+            if heading_style is not None:
+                append(Paragraph(_inline(block), heading_style))
+            elif tag == 'pre':
+                code = ''.join(block.itertext()).rstrip('\n')
+                append(XPreformatted(escape(code, quote=False), code_style))
+            elif tag != 'hr':
+                paragraphs = BLOCK_PARAGRAPHS[tag](block) if tag in BLOCK_PARAGRAPHS else [_inline(block)]
+                for markup in paragraphs:
+                    if markup:
+                        append(Paragraph(markup, body_style))
+
+        return story
+
+    def _generate_parallel(self, chunks, output_path, n_workers):
+        """Render report chunks in worker processes and merge them behind the title page"""
+        # Only long reports are merged, so pypdf is imported on first use
+        from pypdf import PdfWriter
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            title_path = Path(tmp_dir) / 'title.pdf'
+            chunk_paths = [Path(tmp_dir) / f'chunk{i}.pdf' for i in range(len(chunks))]
+
+            # Spawn fresh workers: forking a process that has other threads running
+            # (main.py renders PDFs on a worker thread) can deadlock the children
+            with ProcessPoolExecutor(
+                max_workers=min(n_workers, len(chunks)),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_warmup_styles
+            ) as pool:
+                futures = [
+                    pool.submit(_render_chunk, chunk, str(path))
+                    for chunk, path in zip(chunks, chunk_paths)
+                ]
+                # The title page is rendered here while the workers lay out the body
+                self._build(title_path, self._title_story())
+                for future in futures:
+                    future.result()
+
+            writer = PdfWriter()
+            for path in [title_path] + chunk_paths:
+                writer.append(str(path))
+            writer.write(str(output_path))
+
+    def _generate_html_pdf(self, report_content, output_path):
+        """Render the report through WeasyPrint's HTML layout engine"""
+        global _css
+        if _css is None:
+            _css = CSS(string=CSS_TEMPLATE)
+
+        body = _markdown_to_html(report_content, ['extra', 'toc'])
+        html = f"""<html><head><meta charset="utf-8"></head><body>
+<section class="title-page">
+<h1>PENETRATION TESTING REPORT</h1>
+<p>Generated: {datetime.now().strftime('%B %d, %Y')}</p>
+</section>
+{body}
+</body></html>"""
+
+        HTML(string=html).write_pdf(str(output_path), stylesheets=[_css])
         return output_path
+
+def _render_chunk(chunk, output_path):
+    """Render one chunk of a report body to its own PDF (process pool worker)"""
+    generator = PDFReportGenerator()
+    generator._build(output_path, generator._body_story(chunk))
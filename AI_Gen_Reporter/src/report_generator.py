@@ -1,11 +1,18 @@
 # src/report_generator.py
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Above this many files, reads are spread over a thread pool (file I/O releases the GIL)
+PARALLEL_READ_THRESHOLD = 16
+
+def _read_text(path):
+    """Read a file as UTF-8 without text-mode newline translation"""
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8', 'replace')
+
 def load_scanner_results(results_dir='scanner_results'):
     """Load all scanner result files"""
-    results = {}
-
     # Get the absolute path relative to the script location
     script_dir = Path(__file__).parent.parent  # Go up to project root
     results_path = script_dir / results_dir
@@ -13,10 +20,19 @@ def load_scanner_results(results_dir='scanner_results'):
     # If the path doesn't exist, try relative to current working directory
     if not results_path.exists():
         results_path = Path(results_dir)
+        if not results_path.is_dir():
+            return {}
+
+    # A single directory pass; DirEntry caches the file type so no extra stat is needed
+    with os.scandir(results_path) as it:
+        entries = [e for e in it if e.name.endswith('.md') and e.is_file()]
 
-    for md_file in results_path.glob('*.md'):
-        tool_name = md_file.stem
-        with open(md_file, 'r') as f:
-            results[tool_name] = f.read()
+    paths = [e.path for e in entries]
+    if len(paths) > PARALLEL_READ_THRESHOLD:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            contents = list(pool.map(_read_text, paths))
+    else:
+        contents = [_read_text(path) for path in paths]
 
+    results = {e.name[:-3]: content for e, content in zip(entries, contents)}
     return results
@@ -1,13 +1,20 @@
 # src/terminal_display.py
+import os
 from rich.console import Console
+from rich.live import Live
 from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.table import Table
+from rich.text import Text
 from rich import box
 
+# Reports larger than this are printed as plain text; parsing them as markdown is too slow
+PLAIN_REPORT_CHARS = 200_000
+
 class TerminalDisplay:
-    def __init__(self):
-        self.console = Console()
+    def __init__(self, record=False):
+        # A recording console keeps the rendered report for export_html()
+        self.console = Console(record=record)
 
     def display_header(self):
         """Display application header"""
@@ -36,9 +43,39 @@ class TerminalDisplay:
         ))
         self.console.print("\n")
 
-        # Render markdown in terminal
-        md = Markdown(report_content)
-        self.console.print(md)
+        if self.console.record:
+            # Discard earlier progress output so the recording holds only the report
+            self.console.export_text(clear=True)
+
+        if len(report_content) > PLAIN_REPORT_CHARS:
+            report = Text(report_content)
+        else:
+            # Hyperlink escape sequences are skipped; report links are shown as text
+            report = Markdown(report_content, code_theme="ansi_dark", hyperlinks=False)
+
+        # Page reports that do not fit on screen instead of flooding the scrollback
+        # (the pager bypasses recording, so a recording console prints directly)
+        if (self.console.is_terminal and not self.console.record
+                and report_content.count("\n") > self.console.height):
+            os.environ.setdefault("LESS", "-R")  # let less pass colours through
+            with self.console.pager(styles=True):
+                self.console.print(report)
+        else:
+            self.console.print(report)
+
+    def display_stream(self, chunks):
+        """Show a live preview of a report while it streams in, return the full text"""
+        parts = []
+        tail = ""
+        with Live(console=self.console, refresh_per_second=8, transient=True) as live:
+            for chunk in chunks:
+                parts.append(chunk)
+                # Only the last screenful is previewed; the full report is rendered afterwards
+                tail = (tail + chunk)[-4000:]
+                preview = "\n".join(tail.splitlines()[-(self.console.height - 4):])
+                live.update(Panel(Text(preview), title="Receiving report", border_style="blue"))
+
+        return "".join(parts)
 
     def display_summary_table(self, vulnerabilities):
         """Display vulnerability summary table"""